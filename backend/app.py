@@ -1,21 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import datetime as dt
-import copy
-import json
 import os
 import re
 import shutil
 import subprocess
+import threading
 import time
 from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from collections.abc import Container, MutableMapping
+from typing import Any, Dict, Iterator, Optional
 from uuid import uuid4
 
-from fastapi import FastAPI, HTTPException, Query
+import orjson
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import FileResponse, ORJSONResponse
+from pydantic import BaseModel, Field, field_validator
 from concurrent.futures import ThreadPoolExecutor
 
 ROOT = Path(__file__).resolve().parent
@@ -26,6 +33,11 @@ SPY_SAMPLE_DATA_PATH = PROJECT_ROOT / "results/spy_daily_2016_2020.json"
 
 LEAN_CONFIG_TEMPLATE_PATH = PROJECT_ROOT / "lean-config.json"
 BACKTEST_STORAGE_ROOT = PROJECT_ROOT / "storage/backtests"
+RESULT_FILENAME = "normalized-result.json"
+# Plain .txt so the job-dir scan never mistakes them for Lean's own .log file.
+LEAN_STDOUT_FILENAME = "lean-stdout.txt"
+LEAN_STDERR_FILENAME = "lean-stderr.txt"
+LEAN_OUTPUT_TAIL_BYTES = 4096
 DEFAULT_PYTHONNET_PYDLL = Path(
     "/opt/homebrew/opt/python@3.11/Frameworks/Python.framework/Versions/3.11/lib/libpython3.11.dylib"
 )
@@ -35,63 +47,65 @@ LEAN_LAUNCHER_PATH = Path(
 )
 
 
-ORDER_STATUS_LOOKUP = {
-    0: "New",
-    1: "Submitted",
-    2: "PartiallyFilled",
-    3: "Filled",
-    4: "Canceled",
-    5: "Canceled",
-    6: "Canceled",
-    7: "Invalid",
-    8: "None",
-}
-
-ORDER_DIRECTION_LOOKUP = {0: "Buy", 1: "Sell"}
-
-ORDER_TYPE_LOOKUP = {
-    0: "Market",
-    1: "Limit",
-    2: "StopMarket",
-    3: "StopLimit",
-    4: "MarketOnOpen",
-    5: "MarketOnClose",
-    6: "LimitIfTouched",
-    7: "OptionExercise",
-    8: "OptionAssignment",
-    9: "OptionExercise",
-    10: "TrailingStop",
-    11: "TrailingStopLimit",
-    12: "ComboMarket",
-    13: "ComboLimit",
-    14: "ComboOneCancelsOther",
-}
+# Lean order enums are contiguous from 0, so names are indexed by value rather than hashed.
+ORDER_STATUS_NAMES = (
+    "New",
+    "Submitted",
+    "PartiallyFilled",
+    "Filled",
+    "Canceled",
+    "Canceled",
+    "Canceled",
+    "Invalid",
+    "None",
+)
+
+ORDER_DIRECTION_NAMES = ("Buy", "Sell")
+
+ORDER_TYPE_NAMES = (
+    "Market",
+    "Limit",
+    "StopMarket",
+    "StopLimit",
+    "MarketOnOpen",
+    "MarketOnClose",
+    "LimitIfTouched",
+    "OptionExercise",
+    "OptionAssignment",
+    "OptionExercise",
+    "TrailingStop",
+    "TrailingStopLimit",
+    "ComboMarket",
+    "ComboLimit",
+    "ComboOneCancelsOther",
+)
 
 
-def _map_order_type(value: Any) -> str:
+def _lookup_enum_name(names: tuple[str, ...], value: Any) -> str:
     try:
-        return ORDER_TYPE_LOOKUP.get(int(value), str(value))
+        index = value if type(value) is int else int(value)
     except (TypeError, ValueError):
         return str(value)
+    if 0 <= index < len(names):
+        return names[index]
+    return str(value)
+
+
+def _map_order_type(value: Any) -> str:
+    return _lookup_enum_name(ORDER_TYPE_NAMES, value)
 
 
 def _map_order_status(value: Any) -> str:
-    try:
-        return ORDER_STATUS_LOOKUP.get(int(value), str(value))
-    except (TypeError, ValueError):
-        return str(value)
+    return _lookup_enum_name(ORDER_STATUS_NAMES, value)
 
 
 def _map_order_direction(value: Any) -> str:
-    try:
-        return ORDER_DIRECTION_LOOKUP.get(int(value), str(value))
-    except (TypeError, ValueError):
-        return str(value)
+    return _lookup_enum_name(ORDER_DIRECTION_NAMES, value)
 
 
 def _load_base_config() -> dict[str, Any]:
     try:
-        return json.loads(LEAN_CONFIG_TEMPLATE_PATH.read_text())
+        return orjson.loads(LEAN_CONFIG_TEMPLATE_PATH.read_bytes())
     except FileNotFoundError as exc:  # pragma: no cover - configuration must exist
         raise RuntimeError("Missing lean-config.json template") from exc
 
@@ -107,16 +121,22 @@ def _resolve_python_dll() -> str:
     overridden = os.environ.get("PYTHONNET_PYDLL")
     if overridden:
         return overridden
+    return _default_python_dll()
+
+
+@lru_cache(maxsize=1)
+def _default_python_dll() -> str:
+    # The install location doesn't move while the server runs; a failed lookup isn't cached.
     if DEFAULT_PYTHONNET_PYDLL.exists():
         return str(DEFAULT_PYTHONNET_PYDLL)
     raise RuntimeError("Unable to locate a Python runtime for Lean (set PYTHONNET_PYDLL)")
 
 
 def _resolve_algorithm_config(algorithm_id: str) -> dict[str, Any]:
-    for algo in ALGORITHMS:
-        if algo.get("id") == algorithm_id:
-            return algo
-    raise HTTPException(status_code=400, detail="Unknown algorithm id")
+    try:
+        return ALGORITHMS_BY_ID[algorithm_id]
+    except KeyError:
+        raise HTTPException(status_code=400, detail="Unknown algorithm id") from None
 
 
 def _prepare_job_environment(job_id: str, payload: BacktestRequest) -> dict[str, Any]:
@@ -126,20 +146,23 @@ def _prepare_job_environment(job_id: str, payload: BacktestRequest) -> dict[str,
         shutil.rmtree(job_dir)
     job_dir.mkdir(parents=True, exist_ok=True)
 
-    config = copy.deepcopy(BASE_LEAN_CONFIG)
-    config["results-destination-folder"] = str(job_dir)
-    config["close-automatically"] = True
+    # Only top-level keys are overridden and the merged config is never mutated, so the
+    # template's nested values can be shared instead of copied.
+    overrides: dict[str, Any] = {
+        "results-destination-folder": str(job_dir),
+        "close-automatically": True,
+    }
 
     algorithm_manifest = _resolve_algorithm_config(payload.algorithmId)
     entry_point = algorithm_manifest.get("entryPoint")
     if entry_point:
-        config["algorithm-location"] = str((PROJECT_ROOT / entry_point).resolve())
+        overrides["algorithm-location"] = str((PROJECT_ROOT / entry_point).resolve())
 
     # Optional overrides for dates and parameters
     if payload.startDate:
-        config["start-date"] = payload.startDate
+        overrides["start-date"] = payload.startDate
     if payload.endDate:
-        config["end-date"] = payload.endDate
+        overrides["end-date"] = payload.endDate
 
     manifest_defaults = algorithm_manifest.get("defaults", {})
     default_params = manifest_defaults.get("parameters", {}) if isinstance(manifest_defaults, dict) else {}
@@ -149,17 +172,19 @@ def _prepare_job_environment(job_id: str, payload: BacktestRequest) -> dict[str,
     if payload.parameters:
         parameter_values.update(payload.parameters)
 
-    parameter_values["symbol"] = payload.symbol.upper()
+    parameter_values["symbol"] = payload.symbol
     parameter_values["timeframe"] = payload.timeframe
 
-    config["parameters"] = {
+    overrides["parameters"] = {
         key: str(value)
         for key, value in parameter_values.items()
         if value is not None
     }
 
+    config = {**BASE_LEAN_CONFIG, **overrides}
+
     config_path = job_dir / "lean-config.json"
-    config_path.write_text(json.dumps(config, indent=2))
+    config_path.write_bytes(orjson.dumps(config, option=orjson.OPT_INDENT_2))
 
     return {
         "job_dir": job_dir,
@@ -169,22 +194,43 @@ def _prepare_job_environment(job_id: str, payload: BacktestRequest) -> dict[str,
 
 
 def _parse_decimal(value: Any) -> Optional[Decimal]:
-    if value is None:
-        return None
+    # Lean reports statistics as strings, so that branch is checked first.
+    if isinstance(value, str):
+        cleaned = value.strip()
+        if not cleaned:
+            return None
+        cleaned = cleaned.replace("$", "").replace(",", "")
+        if cleaned.endswith("%"):
+            cleaned = cleaned[:-1]
+        try:
+            return Decimal(cleaned)
+        except InvalidOperation:
+            return None
     if isinstance(value, Decimal):
         return value
-    if isinstance(value, (int, float)):
+    if isinstance(value, int):
+        # Integers convert exactly; only floats need the str() round-trip to avoid binary noise.
+        return Decimal(value)
+    if isinstance(value, float):
         return Decimal(str(value))
+    return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    # Fast path for chart/trade points: Lean emits native JSON numbers, so skip Decimal entirely.
+    if isinstance(value, (int, float, Decimal)):
+        return float(value)
     if isinstance(value, str):
         cleaned = value.strip()
         if not cleaned:
             return None
+        # Same cleanup as _parse_decimal so both accept identical inputs (e.g. "-$5.00").
         cleaned = cleaned.replace("$", "").replace(",", "")
         if cleaned.endswith("%"):
             cleaned = cleaned[:-1]
         try:
-            return Decimal(cleaned)
-        except InvalidOperation:
+            return float(cleaned)
+        except ValueError:
             return None
     return None
 
@@ -202,102 +248,120 @@ def _parse_percentage(value: Any) -> Optional[float]:
     return float(decimal_value / Decimal(100))
 
 
+UNIX_EPOCH_DATE = dt.date(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+
+
+@lru_cache(maxsize=65536)
+def _format_epoch_day(day_number: int) -> str:
+    return (UNIX_EPOCH_DATE + dt.timedelta(days=day_number)).isoformat()
+
+
 def _format_epoch_seconds(epoch: Any) -> str:
     try:
         seconds = int(epoch)
     except (TypeError, ValueError):
         return str(epoch)
-    return dt.datetime.utcfromtimestamp(seconds).date().isoformat()
+    # Cache per UTC day: every point on the same date (across series, and intraday bars) shares one entry.
+    return _format_epoch_day(seconds // SECONDS_PER_DAY)
 
 
 def _format_iso_date(value: str | None) -> str | None:
     if not value:
         return None
+    # Lean writes ISO-8601 timestamps; the calendar date is their first ten characters.
+    if len(value) >= 10 and value[4] == "-" and value[7] == "-" and (len(value) == 10 or value[10] in "T "):
+        return value[:10]
     try:
         return dt.datetime.fromisoformat(value.replace("Z", "+00:00")).date().isoformat()
     except ValueError:
         return value
 
 
+def _series_to_points(values: list[Any]) -> list[dict[str, Any]]:
+    # Local aliases avoid a global lookup per point inside the comprehension.
+    to_float = _to_float
+    format_time = _format_epoch_seconds
+    return [
+        {"time": format_time(point[0]), "value": value}
+        for point in values
+        if isinstance(point, list) and len(point) >= 2 and (value := to_float(point[-1])) is not None
+    ]
+
+
+def _series_to_candles(values: list[Any]) -> list[dict[str, Any]]:
+    # Points are [time, open, high, low, close]; shorter points fall back to open/last value.
+    to_float = _to_float
+    format_time = _format_epoch_seconds
+    return [
+        {
+            "time": format_time(point[0]),
+            "open": to_float(point[1]) or close,
+            "high": to_float(point[2] if size > 2 else point[1]) or close,
+            "low": to_float(point[3] if size > 3 else point[1]) or close,
+            "close": close,
+        }
+        for point in values
+        if isinstance(point, list)
+        and (size := len(point)) >= 2
+        and (close := to_float(point[4] if size > 4 else point[-1])) is not None
+    ]
+
+
 def _extract_equity_curve(summary: dict[str, Any]) -> list[dict[str, Any]]:
-    equity_values = (
-        summary.get("charts", {})
-        .get("Strategy Equity", {})
-        .get("series", {})
-        .get("Equity", {})
-        .get("values", [])
-    )
-    curve: list[dict[str, Any]] = []
-    for point in equity_values:
-        if not isinstance(point, list) or len(point) < 2:
-            continue
-        time_label = _format_epoch_seconds(point[0])
-        value = point[-1]
-        decimal_value = _parse_decimal(value)
-        if decimal_value is None:
-            continue
-        curve.append({"time": time_label, "value": float(decimal_value)})
-    return curve
+    try:
+        equity_values = summary["charts"]["Strategy Equity"]["series"]["Equity"]["values"]
+    except (KeyError, TypeError):
+        return []
+    return _series_to_points(equity_values)
 
 
 def _extract_price_series(report: dict[str, Any], symbol: str) -> list[dict[str, Any]]:
-    charts = report.get("charts", {}) if report else {}
-    candidate_chart = charts.get(symbol) or charts.get(symbol.upper())
+    charts = report.get("charts") if report else None
+    if not charts:
+        return []
+
+    candidate_chart = charts.get(symbol)
     if not candidate_chart:
-        candidate_chart = charts.get("Benchmark")
+        normalized_symbol = symbol.upper()
+        if normalized_symbol != symbol:
+            candidate_chart = charts.get(normalized_symbol)
     if not candidate_chart:
+        candidate_chart = charts.get("Benchmark")
+    try:
+        series_map = candidate_chart["series"]
+    except (KeyError, TypeError):
         return []
 
-    for series in candidate_chart.get("series", {}).values():
-        values = series.get("values", [])
+    for series in series_map.values():
+        values = series.get("values")
         if not values:
             continue
 
-        price_points: list[dict[str, Any]] = []
-        for point in values:
-            if not isinstance(point, list) or len(point) < 2:
-                continue
-
-            timestamp = point[0]
-            open_raw = point[1] if len(point) > 1 else None
-            high_raw = point[2] if len(point) > 2 else open_raw
-            low_raw = point[3] if len(point) > 3 else open_raw
-            close_raw = point[4] if len(point) > 4 else point[-1]
-
-            close_decimal = _parse_decimal(close_raw)
-            if close_decimal is None:
-                continue
-
-            open_decimal = _parse_decimal(open_raw) or close_decimal
-            high_decimal = _parse_decimal(high_raw) or close_decimal
-            low_decimal = _parse_decimal(low_raw) or close_decimal
-
-            price_points.append(
-                {
-                    "time": _format_epoch_seconds(timestamp),
-                    "open": float(open_decimal),
-                    "high": float(high_decimal),
-                    "low": float(low_decimal),
-                    "close": float(close_decimal),
-                }
-            )
-
+        price_points = _series_to_candles(values)
         if price_points:
             return price_points
 
     return []
 
 
-def _normalize_indicator_key(chart_name: str, series_name: str, existing: set[str]) -> str:
+INDICATOR_KEY_SEPARATOR_PATTERN = re.compile(r"[^0-9a-zA-Z]+")
+
+
+@lru_cache(maxsize=1024)
+def _indicator_base_key(chart_name: str, series_name: str) -> str:
     base = f"{chart_name} {series_name}".strip()
-    cleaned = re.sub(r"[^0-9a-zA-Z]+", " ", base).strip()
+    cleaned = INDICATOR_KEY_SEPARATOR_PATTERN.sub(" ", base).strip()
     if not cleaned:
         cleaned = "indicator"
     camel = cleaned.title().replace(" ", "")
     if camel:
-        key = camel[0].lower() + camel[1:]
-    else:
-        key = "indicator"
+        return camel[0].lower() + camel[1:]
+    return "indicator"
+
+
+def _normalize_indicator_key(chart_name: str, series_name: str, existing: Container[str]) -> str:
+    key = _indicator_base_key(chart_name, series_name)
     suffix = 2
     candidate = key
     while candidate in existing:
@@ -306,57 +370,81 @@ def _normalize_indicator_key(chart_name: str, series_name: str, existing: set[st
     return candidate
 
 
-def _extract_indicator_series(report: dict[str, Any], symbol: str) -> list[dict[str, Any]]:
+def _extract_indicator_map(report: dict[str, Any], symbol: str) -> dict[str, dict[str, Any]]:
+    """Return indicator series keyed by their unique id, in chart discovery order."""
     charts = report.get("charts", {}) if report else {}
     normalized_symbol = (symbol or "").upper()
-    skip_names = {normalized_symbol, symbol, "Strategy Equity", "Benchmark"}
+    skip_names = frozenset({normalized_symbol, symbol, "Strategy Equity", "Benchmark"})
 
-    indicators: list[dict[str, Any]] = []
-    seen_keys: set[str] = set()
+    # The map doubles as the set of taken keys when de-duplicating ids.
+    indicators: dict[str, dict[str, Any]] = {}
 
+    # Chart/series names are JSON object keys (always str); malformed nodes fall out via the excepts.
     for chart_name, chart in charts.items():
-        if not isinstance(chart_name, str) or not isinstance(chart, dict):
-            continue
         if chart_name in skip_names:
             continue
 
-        series_map = chart.get("series", {})
-        if not isinstance(series_map, dict):
+        try:
+            series_items = chart["series"].items()
+        except (KeyError, TypeError, AttributeError):
             continue
 
-        for series_name, series in series_map.items():
-            if not isinstance(series_name, str) or not isinstance(series, dict):
+        for series_name, series in series_items:
+            try:
+                series_values = series["values"]
+            except (KeyError, TypeError):
                 continue
 
-            values = []
-            for point in series.get("values", []):
-                if not isinstance(point, list) or len(point) < 2:
-                    continue
-                time_label = _format_epoch_seconds(point[0])
-                decimal_value = _parse_decimal(point[-1])
-                if decimal_value is None:
-                    continue
-                values.append({"time": time_label, "value": float(decimal_value)})
-
+            values = _series_to_points(series_values)
             if not values:
                 continue
 
-            key = _normalize_indicator_key(chart_name, series_name, seen_keys)
-            seen_keys.add(key)
-            indicators.append(
-                {
-                    "id": key,
-                    "chart": chart_name,
-                    "series": series_name,
-                    "label": f"{chart_name} · {series_name}",
-                    "data": values,
-                }
-            )
+            key = _normalize_indicator_key(chart_name, series_name, indicators)
+            indicators[key] = {
+                "id": key,
+                "chart": chart_name,
+                "series": series_name,
+                "label": f"{chart_name} · {series_name}",
+                "data": values,
+            }
 
-    indicators.sort(key=lambda item: item["label"])
     return indicators
 
 
+def _extract_indicator_series(report: dict[str, Any], symbol: str) -> list[dict[str, Any]]:
+    return sorted(_extract_indicator_map(report, symbol).values(), key=itemgetter("label"))
+
+
+TRADE_SYMBOL_KEYS = ("value", "ticker", "permtick", "id")
+
+
+def _trade_matches_symbol(trade: dict[str, Any], symbol_filter: str) -> bool:
+    """Return True when the trade references ``symbol_filter`` or carries no symbol at all."""
+    has_symbol = False
+
+    raw_symbol = trade.get("symbol")
+    if isinstance(raw_symbol, str):
+        # Most common shape; matching here skips the dict and alias checks entirely.
+        if raw_symbol.upper() == symbol_filter:
+            return True
+        has_symbol = True
+    elif isinstance(raw_symbol, dict):
+        for key in TRADE_SYMBOL_KEYS:
+            value = raw_symbol.get(key)
+            if isinstance(value, str):
+                if value.upper() == symbol_filter:
+                    return True
+                has_symbol = True
+
+    alt = trade.get("symbolId") or trade.get("symbolID")
+    if isinstance(alt, str):
+        if alt.upper() == symbol_filter:
+            return True
+        has_symbol = True
+
+    return not has_symbol
+
+
 def _extract_trades(
     summary: dict[str, Any],
     report: dict[str, Any] | None = None,
@@ -391,29 +479,14 @@ def _extract_trades(
         if not isinstance(trade, dict):
             continue
 
-        if symbol_filter:
-            symbol_values: set[str] = set()
-            raw_symbol = trade.get("symbol")
-            if isinstance(raw_symbol, dict):
-                for key in ("value", "ticker", "permtick", "id"):
-                    value = raw_symbol.get(key)
-                    if isinstance(value, str):
-                        symbol_values.add(value.upper())
-            elif isinstance(raw_symbol, str):
-                symbol_values.add(raw_symbol.upper())
-
-            alt = trade.get("symbolId") or trade.get("symbolID")
-            if isinstance(alt, str):
-                symbol_values.add(alt.upper())
-
-            if symbol_values and symbol_filter not in symbol_values:
-                continue
+        if symbol_filter and not _trade_matches_symbol(trade, symbol_filter):
+            continue
 
         entry_date = _format_iso_date(trade.get("entryTime"))
         exit_date = _format_iso_date(trade.get("exitTime"))
-        entry_price = _parse_decimal(trade.get("entryPrice"))
-        exit_price = _parse_decimal(trade.get("exitPrice"))
-        profit = _parse_decimal(trade.get("profitLoss"))
+        entry_price = _to_float(trade.get("entryPrice"))
+        exit_price = _to_float(trade.get("exitPrice"))
+        profit = _to_float(trade.get("profitLoss"))
 
         trades.append(
             {
@@ -421,10 +494,10 @@ def _extract_trades(
                 "direction": "Long" if trade.get("direction") == 0 else "Short",
                 "entryTime": entry_date or str(trade.get("entryTime")),
                 "exitTime": exit_date or str(trade.get("exitTime")),
-                "entryPrice": float(entry_price) if entry_price is not None else 0.0,
-                "exitPrice": float(exit_price) if exit_price is not None else 0.0,
+                "entryPrice": entry_price if entry_price is not None else 0.0,
+                "exitPrice": exit_price if exit_price is not None else 0.0,
                 "quantity": trade.get("quantity", 0),
-                "profit": float(profit) if profit is not None else 0.0,
+                "profit": profit if profit is not None else 0.0,
             }
         )
 
@@ -436,30 +509,64 @@ def _extract_orders(report: dict[str, Any]) -> list[dict[str, Any]]:
     if not isinstance(order_map, dict):
         return []
 
-    orders: list[dict[str, Any]] = []
-    for order_id, order in order_map.items():
+    # Sort on a (time, id, position) tuple built alongside each row; tuple comparison runs in C.
+    keyed_orders: list[tuple[str, int, int, dict[str, Any]]] = []
+    for position, (order_id, order) in enumerate(order_map.items()):
         if not isinstance(order, dict):
             continue
 
-        price_decimal = _parse_decimal(order.get("price"))
-
-        orders.append(
-            {
-                "id": int(order.get("id", order_id)),
-                "symbol": order.get("symbol", {}).get("value"),
-                "time": _format_iso_date(order.get("time")) or order.get("time"),
-                "type": _map_order_type(order.get("type")),
-                "direction": _map_order_direction(order.get("direction")),
-                "status": _map_order_status(order.get("status")),
-                "quantity": order.get("quantity"),
-                "price": float(price_decimal) if price_decimal is not None else None,
-                "lastFillTime": _format_iso_date(order.get("lastFillTime")) or order.get("lastFillTime"),
-                "tag": order.get("tag") or "",
-            }
-        )
-
-    orders.sort(key=lambda item: (item["time"] or "", item["id"]))
-    return orders
+        record = {
+            "id": int(order.get("id", order_id)),
+            "symbol": order.get("symbol", {}).get("value"),
+            "time": _format_iso_date(order.get("time")) or order.get("time"),
+            "type": _map_order_type(order.get("type")),
+            "direction": _map_order_direction(order.get("direction")),
+            "status": _map_order_status(order.get("status")),
+            "quantity": order.get("quantity"),
+            "price": _to_float(order.get("price")),
+            "lastFillTime": _format_iso_date(order.get("lastFillTime")) or order.get("lastFillTime"),
+            "tag": order.get("tag") or "",
+        }
+        keyed_orders.append((record["time"] or "", record["id"], position, record))
+
+    keyed_orders.sort()
+    return [item[-1] for item in keyed_orders]
+
+
+def _index_job_dir(job_dir: Path) -> dict[str, Path]:
+    """Classify Lean artifacts in ``job_dir`` with a single directory scan."""
+    paths: dict[str, Path] = {}
+    json_files: dict[str, Path] = {}
+    with os.scandir(job_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.endswith("-summary.json"):
+                paths.setdefault("summary", Path(entry.path))
+            elif name.endswith("-order-events.json"):
+                paths.setdefault("order_events", Path(entry.path))
+            elif name.endswith(".log"):
+                paths.setdefault("log", Path(entry.path))
+            elif name.endswith(".json"):
+                json_files[name] = Path(entry.path)
+
+    # Lean writes the full report next to the summary as "<name>.json" for "<name>-summary.json".
+    summary_path = paths.get("summary")
+    if summary_path:
+        report_path = json_files.get(summary_path.name.replace("-summary", ""))
+        if report_path:
+            paths["report"] = report_path
+    return paths
+
+
+def _read_output_tail(path: Path, limit: int = LEAN_OUTPUT_TAIL_BYTES) -> str:
+    """Return the last ``limit`` bytes of a captured Lean output file as text."""
+    try:
+        with path.open("rb") as handle:
+            handle.seek(0, os.SEEK_END)
+            handle.seek(max(handle.tell() - limit, 0))
+            return handle.read().decode("utf-8", errors="replace").strip()
+    except FileNotFoundError:
+        return ""
 
 
 def _build_backtest_result(
@@ -468,13 +575,16 @@ def _build_backtest_result(
     summary_path: Path,
     report_path: Path | None,
     job_env: dict[str, Any],
-    lean_stdout: str,
-    lean_stderr: str,
+    lean_stdout_path: Path,
+    lean_stderr_path: Path,
     duration_seconds: float,
+    artifact_paths: dict[str, Path] | None = None,
 ) -> dict[str, Any]:
+    if artifact_paths is None:
+        artifact_paths = _index_job_dir(job_env["job_dir"])
     base_job = JOB_STORE.get(job_id, {})
     summary = _load_json(summary_path)
-    report = _load_json(report_path) if report_path and report_path.exists() else {}
+    report = _load_json(report_path) if report_path else {}
 
     trade_stats = summary.get("totalPerformance", {}).get("tradeStatistics", {})
     portfolio_stats = summary.get("totalPerformance", {}).get("portfolioStatistics", {})
@@ -500,22 +610,22 @@ def _build_backtest_result(
         "summaryPath": str(summary_path),
         "reportPath": str(report_path) if report_path else None,
         "jobDirectory": str(job_env["job_dir"]),
-        "stdout": lean_stdout.strip() or None,
-        "stderr": lean_stderr.strip() or None,
+        "stdoutPath": str(lean_stdout_path),
+        "stderrPath": str(lean_stderr_path),
     }
 
-    order_events_path = next(job_env["job_dir"].glob("*-order-events.json"), None)
+    order_events_path = artifact_paths.get("order_events")
     if order_events_path:
         artifacts["orderEventsPath"] = str(order_events_path)
 
-    log_path = next(job_env["job_dir"].glob("*.log"), None)
+    log_path = artifact_paths.get("log")
     if log_path:
         artifacts["logPath"] = str(log_path)
 
     result = {
         "jobId": job_id,
         "status": "completed",
-        "symbol": payload.symbol.upper(),
+        "symbol": payload.symbol,
         "timeframe": payload.timeframe,
         "parameters": payload.parameters,
         "submittedAt": base_job.get("submittedAt"),
@@ -541,17 +651,169 @@ def _build_backtest_result(
 
 def _load_json(path: Path) -> Any:
     try:
-        return json.loads(path.read_text())
+        return orjson.loads(path.read_bytes())
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=500, detail=f"Missing resource: {path}") from exc
+
+
+@lru_cache(maxsize=4)
+def _load_market_sample(path_str: str, mtime_ns: int, symbol: str, timeframe: str) -> bytes:
+    # Keyed on mtime so a re-exported sample is picked up without restarting the server.
+    candles = _load_json(Path(path_str))
+    return orjson.dumps({"symbol": symbol, "timeframe": timeframe, "candles": candles})
+
+
+def _market_sample_bytes(path: Path, symbol: str, timeframe: str) -> bytes:
+    try:
+        mtime_ns = path.stat().st_mtime_ns
     except FileNotFoundError as exc:
         raise HTTPException(status_code=500, detail=f"Missing resource: {path}") from exc
+    return _load_market_sample(str(path), mtime_ns, symbol, timeframe)
 
 
 ALGORITHMS: list[dict[str, Any]] = _load_json(ALGORITHMS_PATH)
+ALGORITHMS_BY_ID: dict[str, dict[str, Any]] = {algo["id"]: algo for algo in ALGORITHMS if "id" in algo}
+# Static responses are encoded once; recompute if the manifest is ever reloaded at runtime.
+ALGORITHMS_RESPONSE_BYTES: bytes = orjson.dumps(ALGORITHMS)
+HEALTHCHECK_RESPONSE_BYTES: bytes = orjson.dumps({"status": "ok"})
+
+PENDING_JOB_STATUSES = frozenset({"queued", "running"})
+
+
+class JobStore(MutableMapping[str, Dict[str, Any]]):
+    """Thread-safe job registry that evicts finished jobs beyond a size and age budget.
+
+    Queued/running jobs are never evicted but count toward ``max_entries``. Finished jobs
+    expire ``ttl_seconds`` after their last write, and the oldest finished jobs are dropped
+    while the store holds more than ``max_entries`` jobs.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _is_expired(self, stamp: float, record: Dict[str, Any], now: float) -> bool:
+        return record.get("status") not in PENDING_JOB_STATUSES and now - stamp >= self.ttl_seconds
+
+    def _prune(self, now: float) -> None:
+        # Entries are ordered by last write, so walk from the oldest and stop at the first finished
+        # job that is both within the TTL and within budget. Pending jobs are set aside rather than
+        # skipped in place, keeping each write proportional to what it evicts, not the store size.
+        pending: list[tuple[str, tuple[float, Dict[str, Any]]]] = []
+        while self._entries:
+            key, (stamp, record) = next(iter(self._entries.items()))
+            if record.get("status") in PENDING_JOB_STATUSES:
+                pending.append(self._entries.popitem(last=False))
+                continue
+            over_budget = len(self._entries) + len(pending) > self.max_entries
+            if not over_budget and now - stamp < self.ttl_seconds:
+                break
+            del self._entries[key]
+
+        for key, entry in reversed(pending):
+            self._entries[key] = entry
+            self._entries.move_to_end(key, last=False)
+
+    def __getitem__(self, job_id: str) -> Dict[str, Any]:
+        with self._lock:
+            stamp, record = self._entries[job_id]
+            if self._is_expired(stamp, record, time.monotonic()):
+                del self._entries[job_id]
+                raise KeyError(job_id)
+            return record
+
+    def __setitem__(self, job_id: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._entries[job_id] = (now, record)
+            self._entries.move_to_end(job_id)
+            self._prune(now)
+
+    def __delitem__(self, job_id: str) -> None:
+        with self._lock:
+            del self._entries[job_id]
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+JOB_STORE = JobStore(
+    max_entries=max(1, int(os.environ.get("JOB_STORE_MAX", "1024"))),
+    ttl_seconds=float(os.environ.get("JOB_STORE_TTL", "3600")),
+)
+# Each worker thread only supervises an external `dotnet` process, so threads (which share
+# JOB_STORE with the request handlers) are sufficient; LEAN_WORKERS caps concurrent runs.
+LEAN_WORKERS = max(1, int(os.environ.get("LEAN_WORKERS", "2")))
+EXECUTOR = ThreadPoolExecutor(max_workers=LEAN_WORKERS, thread_name_prefix="lean-job")
+
+MAX_LONG_POLL_SECONDS = 60.0
+
+# Long-poll waiters per job: each GET ?wait=... registers an event bound to its own event loop,
+# and the worker thread wakes them through call_soon_threadsafe once the job finishes.
+JOB_WAITERS: Dict[str, list[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+JOB_WAITERS_LOCK = threading.Lock()
+
+
+def _notify_job_finished(job_id: str) -> None:
+    with JOB_WAITERS_LOCK:
+        waiters = JOB_WAITERS.pop(job_id, [])
+    for loop, event in waiters:
+        with contextlib.suppress(RuntimeError):  # loop already closed
+            loop.call_soon_threadsafe(event.set)
+
+
+async def _wait_for_job(job_id: str, timeout: float) -> None:
+    waiter = (asyncio.get_running_loop(), asyncio.Event())
+    with JOB_WAITERS_LOCK:
+        JOB_WAITERS.setdefault(job_id, []).append(waiter)
+    try:
+        # Re-check after registering so a job that finished in between is not missed.
+        current = JOB_STORE.get(job_id)
+        if current is None or current.get("status") not in PENDING_JOB_STATUSES:
+            return
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(waiter[1].wait(), timeout=timeout)
+    finally:
+        with JOB_WAITERS_LOCK:
+            pending = JOB_WAITERS.get(job_id)
+            if pending and waiter in pending:
+                pending.remove(waiter)
+                if not pending:
+                    del JOB_WAITERS[job_id]
+
+
+JSON_RESPONSE_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
 
-JOB_STORE: Dict[str, Dict[str, Any]] = {}
-EXECUTOR = ThreadPoolExecutor(max_workers=2)
 
-app = FastAPI(title="QuantConnect Control Room API", version="0.1.0")
+class JSONBytesResponse(ORJSONResponse):
+    """orjson-backed response that also tolerates stray ``Decimal`` values."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_json_default, option=JSON_RESPONSE_OPTIONS)
+
+
+app = FastAPI(
+    title="QuantConnect Control Room API",
+    version="0.1.0",
+    default_response_class=JSONBytesResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -570,22 +832,28 @@ class BacktestRequest(BaseModel):
     endDate: Optional[str] = Field(None, description="ISO end date override")
     parameters: Dict[str, Any] = Field(default_factory=dict, description="Algorithm-specific parameters")
 
+    @field_validator("symbol")
+    @classmethod
+    def _normalize_symbol(cls, value: str) -> str:
+        # Normalize once at the request boundary; downstream helpers read the field as-is.
+        return value.upper()
+
 
 @app.get("/algorithms")
-def get_algorithms() -> list[dict[str, Any]]:
-    return ALGORITHMS
+async def get_algorithms() -> Response:
+    return Response(content=ALGORITHMS_RESPONSE_BYTES, media_type="application/json")
 
 
 @app.post("/backtests")
-def submit_backtest(payload: BacktestRequest) -> dict[str, Any]:
-    if not any(algo["id"] == payload.algorithmId for algo in ALGORITHMS):
-        raise HTTPException(status_code=400, detail="Unknown algorithm id")
+async def submit_backtest(payload: BacktestRequest) -> dict[str, Any]:
+    # Validate up front so unknown ids fail the request rather than the queued job.
+    _resolve_algorithm_config(payload.algorithmId)
 
-    job_id = str(uuid4())
+    job_id = uuid4().hex
     JOB_STORE[job_id] = {
         "jobId": job_id,
         "status": "queued",
-        "symbol": payload.symbol.upper(),
+        "symbol": payload.symbol,
         "timeframe": payload.timeframe,
         "parameters": payload.parameters,
         "submittedAt": time.time(),
@@ -597,35 +865,61 @@ def submit_backtest(payload: BacktestRequest) -> dict[str, Any]:
 
 
 @app.get("/backtests/{job_id}")
-def get_backtest(job_id: str) -> dict[str, Any]:
+async def get_backtest(
+    job_id: str,
+    wait: float = Query(
+        0,
+        ge=0,
+        le=MAX_LONG_POLL_SECONDS,
+        description="Seconds to hold the request open while the job is queued or running",
+    ),
+) -> Response:
     result = JOB_STORE.get(job_id)
     if not result:
         raise HTTPException(status_code=404, detail="Backtest not found")
-    return result
+    if wait and result.get("status") in PENDING_JOB_STATUSES:
+        await _wait_for_job(job_id, wait)
+        result = JOB_STORE.get(job_id) or result
+    result_path = result.get("resultPath")
+    if result_path:
+        # Finished results live on disk already encoded; serve the file without touching Python objects.
+        # Stat once off the event loop and hand the result to FileResponse so it never re-stats.
+        try:
+            stat_result = await asyncio.to_thread(os.stat, result_path)
+        except OSError:
+            raise HTTPException(status_code=404, detail="Backtest result is no longer available") from None
+        return FileResponse(result_path, stat_result=stat_result, media_type="application/json")
+    # Pending and error records are small; returning the response directly still skips
+    # FastAPI's jsonable_encoder pass.
+    return JSONBytesResponse(result)
 
 
+# Plain def: the per-request mtime stat (and a full reload after a re-export) is blocking file
+# I/O, so this endpoint runs in the threadpool rather than on the event loop.
 @app.get("/market-data")
 def get_market_data(
     symbol: str = Query(..., min_length=1, description="Ticker symbol (e.g., SPY)"),
     timeframe: str = Query("1D", description="Requested timeframe"),
-) -> dict[str, Any]:
+) -> Response:
     normalized_symbol = symbol.upper()
     normalized_timeframe = timeframe.lower()
 
     if normalized_symbol == "SPY" and normalized_timeframe in {"1d", "daily"}:
-        candles = _load_json(SPY_SAMPLE_DATA_PATH)
-        return {"symbol": normalized_symbol, "timeframe": "1D", "candles": candles}
+        content = _market_sample_bytes(SPY_SAMPLE_DATA_PATH, normalized_symbol, "1D")
+        return Response(content=content, media_type="application/json")
 
     raise HTTPException(status_code=404, detail="Sample data not available for the requested symbol/timeframe")
 
 
 @app.get("/")
-def healthcheck() -> dict[str, str]:
-    return {"status": "ok"}
+async def healthcheck() -> Response:
+    return Response(content=HEALTHCHECK_RESPONSE_BYTES, media_type="application/json")
 
 
 def _run_backtest_job(job_id: str, payload: BacktestRequest) -> None:
-    JOB_STORE[job_id]["status"] = "running"
+    # Records are replaced, never mutated in place, so readers only ever see a complete snapshot.
+    queued_record = JOB_STORE.get(job_id) or {"jobId": job_id}
+    JOB_STORE[job_id] = {**queued_record, "status": "running"}
     try:
         job_env = _prepare_job_environment(job_id, payload)
         config_path: Path = job_env["config_path"]
@@ -646,26 +940,31 @@ def _run_backtest_job(job_id: str, payload: BacktestRequest) -> None:
             str(config_path),
         ]
 
+        # Lean output goes straight to disk; only the tail is read back when reporting a failure.
+        stdout_path = job_env["job_dir"] / LEAN_STDOUT_FILENAME
+        stderr_path = job_env["job_dir"] / LEAN_STDERR_FILENAME
         start_time = time.time()
-        process = subprocess.run(
-            command,
-            cwd=str(LEAN_LAUNCHER_PATH),
-            capture_output=True,
-            text=True,
-            env=env,
-            check=False,
-        )
+        with stdout_path.open("wb") as stdout_file, stderr_path.open("wb") as stderr_file:
+            process = subprocess.run(
+                command,
+                cwd=str(LEAN_LAUNCHER_PATH),
+                stdout=stdout_file,
+                stderr=stderr_file,
+                env=env,
+                check=False,
+            )
         duration = time.time() - start_time
 
         if process.returncode != 0:
-            stderr = process.stderr.strip() or process.stdout.strip()
+            stderr = _read_output_tail(stderr_path) or _read_output_tail(stdout_path)
             raise RuntimeError(f"Lean exited with {process.returncode}: {stderr}")
 
-        summary_path = next(job_env["job_dir"].glob("*-summary.json"), None)
+        artifact_paths = _index_job_dir(job_env["job_dir"])
+        summary_path = artifact_paths.get("summary")
         if not summary_path:
             raise RuntimeError("Lean backtest completed but no summary JSON was produced")
 
-        report_path = summary_path.with_name(summary_path.name.replace("-summary", ""))
+        report_path = artifact_paths.get("report")
 
         result_payload = _build_backtest_result(
             job_id,
@@ -673,19 +972,35 @@ def _run_backtest_job(job_id: str, payload: BacktestRequest) -> None:
             summary_path,
             report_path,
             job_env,
-            lean_stdout=process.stdout,
-            lean_stderr=process.stderr,
+            lean_stdout_path=stdout_path,
+            lean_stderr_path=stderr_path,
             duration_seconds=duration,
+            artifact_paths=artifact_paths,
         )
 
-        JOB_STORE[job_id] = result_payload
+        # Keep only a small record in memory; the full payload is encoded once to the job directory.
+        result_path = job_env["job_dir"] / RESULT_FILENAME
+        result_path.write_bytes(
+            orjson.dumps(result_payload, default=_json_default, option=JSON_RESPONSE_OPTIONS)
+        )
+        JOB_STORE[job_id] = {
+            "jobId": job_id,
+            "status": result_payload["status"],
+            "symbol": result_payload["symbol"],
+            "timeframe": result_payload["timeframe"],
+            "parameters": result_payload["parameters"],
+            "submittedAt": result_payload["submittedAt"],
+            "resultPath": str(result_path),
+        }
     except Exception as exc:  # pragma: no cover - defensive
         JOB_STORE[job_id] = {
             "jobId": job_id,
             "status": "error",
-            "symbol": payload.symbol.upper(),
+            "symbol": payload.symbol,
             "timeframe": payload.timeframe,
             "parameters": payload.parameters,
             "error": str(exc),
         }
+    finally:
+        _notify_job_finished(job_id)
 
@@ -1,4 +1,7 @@
 import json
+import os
+import threading
+import time
 from collections.abc import Iterator
 from pathlib import Path
 from subprocess import CompletedProcess
@@ -60,6 +63,43 @@ def test_market_data_returns_spy_sample(client: TestClient) -> None:
     assert len(data["candles"]) > 0
 
 
+def test_market_data_sample_is_loaded_once(monkeypatch: pytest.MonkeyPatch, client: TestClient) -> None:
+    app_module._load_market_sample.cache_clear()
+    loads: list[Path] = []
+    original_load_json = app_module._load_json
+
+    def counting_load_json(path: Path) -> Any:
+        loads.append(path)
+        return original_load_json(path)
+
+    monkeypatch.setattr(app_module, "_load_json", counting_load_json)
+
+    first = client.get("/market-data", params={"symbol": "SPY", "timeframe": "1D"})
+    second = client.get("/market-data", params={"symbol": "spy", "timeframe": "daily"})
+
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert len(loads) == 1
+
+
+def test_market_data_reloads_sample_when_file_changes(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, client: TestClient
+) -> None:
+    app_module._load_market_sample.cache_clear()
+    sample_path = tmp_path / "spy.json"
+    sample_path.write_text(json.dumps([{"time": "2020-01-02", "close": 1.0}]))
+    monkeypatch.setattr(app_module, "SPY_SAMPLE_DATA_PATH", sample_path)
+
+    first = client.get("/market-data", params={"symbol": "SPY"})
+    sample_path.write_text(json.dumps([{"time": "2020-01-02", "close": 1.0}, {"time": "2020-01-03", "close": 2.0}]))
+    stat = sample_path.stat()
+    os.utime(sample_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    second = client.get("/market-data", params={"symbol": "SPY"})
+
+    assert len(first.json()["candles"]) == 1
+    assert len(second.json()["candles"]) == 2
+
+
 def test_market_data_unknown_symbol(client: TestClient) -> None:
     response = client.get("/market-data", params={"symbol": "qqq", "timeframe": "1D"})
     assert response.status_code == 404
@@ -81,7 +121,7 @@ def test_submit_backtest_queues_job(monkeypatch: pytest.MonkeyPatch, client: Tes
 
     payload = {
         "algorithmId": app_module.ALGORITHMS[0]["id"],
-        "symbol": "SPY",
+        "symbol": "spy",
         "timeframe": "1D",
         "parameters": {"foo": "bar"},
     }
@@ -98,6 +138,95 @@ def test_submit_backtest_queues_job(monkeypatch: pytest.MonkeyPatch, client: Tes
     func, args, kwargs = dummy_executor.calls[0]
     assert func is app_module._run_backtest_job
     assert isinstance(args[1], app_module.BacktestRequest)
+    assert args[1].symbol == "SPY"
+
+
+def test_get_backtest_serves_persisted_result(tmp_path: Path, client: TestClient) -> None:
+    result_path = tmp_path / app_module.RESULT_FILENAME
+    result_path.write_text(json.dumps({"jobId": "job-disk", "status": "completed", "trades": []}))
+    app_module.JOB_STORE["job-disk"] = {
+        "jobId": "job-disk",
+        "status": "completed",
+        "resultPath": str(result_path),
+    }
+
+    response = client.get("/backtests/job-disk")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"jobId": "job-disk", "status": "completed", "trades": []}
+
+    result_path.unlink()
+    assert client.get("/backtests/job-disk").status_code == 404
+
+
+def test_get_backtest_unknown_job(client: TestClient) -> None:
+    response = client.get("/backtests/missing")
+    assert response.status_code == 404
+
+
+def test_get_backtest_long_poll_returns_on_completion(client: TestClient) -> None:
+    job_id = "job-wait"
+    app_module.JOB_STORE[job_id] = {"jobId": job_id, "status": "running"}
+
+    def finish_job() -> None:
+        time.sleep(0.1)
+        app_module.JOB_STORE[job_id] = {"jobId": job_id, "status": "error", "error": "boom"}
+        app_module._notify_job_finished(job_id)
+
+    worker = threading.Thread(target=finish_job)
+    worker.start()
+    started = time.monotonic()
+    response = client.get(f"/backtests/{job_id}", params={"wait": 10})
+    worker.join()
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "error"
+    assert time.monotonic() - started < 5
+    assert job_id not in app_module.JOB_WAITERS
+
+
+def test_get_backtest_long_poll_times_out_with_current_state(client: TestClient) -> None:
+    job_id = "job-slow"
+    app_module.JOB_STORE[job_id] = {"jobId": job_id, "status": "queued"}
+
+    response = client.get(f"/backtests/{job_id}", params={"wait": 0.05})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "queued"
+    assert job_id not in app_module.JOB_WAITERS
+
+
+def test_job_store_evicts_oldest_finished_jobs() -> None:
+    store = app_module.JobStore(max_entries=2, ttl_seconds=3600)
+    store["queued"] = {"status": "queued"}
+    store["done-1"] = {"status": "completed"}
+    store["done-2"] = {"status": "error"}
+
+    assert "done-1" not in store
+    assert set(store) == {"queued", "done-2"}
+
+    store["queued-2"] = {"status": "running"}
+    assert set(store) == {"queued", "queued-2"}
+
+
+def test_job_store_expires_finished_jobs_but_keeps_pending() -> None:
+    store = app_module.JobStore(max_entries=10, ttl_seconds=0)
+    store["pending"] = {"status": "running"}
+    store["done"] = {"status": "completed"}
+
+    assert store.get("done") is None
+    assert store["pending"]["status"] == "running"
+
+
+def test_job_store_prune_preserves_write_order() -> None:
+    store = app_module.JobStore(max_entries=3, ttl_seconds=3600)
+    store["running-1"] = {"status": "running"}
+    store["done-1"] = {"status": "completed"}
+    store["queued-1"] = {"status": "queued"}
+    store["done-2"] = {"status": "completed"}
+    store["done-3"] = {"status": "completed"}
+
+    assert list(store) == ["running-1", "queued-1", "done-3"]
 
 
 def test_prepare_job_environment_injects_parameters(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
@@ -111,9 +240,13 @@ def test_prepare_job_environment_injects_parameters(monkeypatch: pytest.MonkeyPa
         parameters={"foo": "bar"},
     )
 
+    template_before = json.dumps(app_module.BASE_LEAN_CONFIG, sort_keys=True)
     env = app_module._prepare_job_environment("job-1", payload)
     config_data = json.loads(Path(env["config_path"]).read_text())
 
+    assert json.dumps(app_module.BASE_LEAN_CONFIG, sort_keys=True) == template_before
+    assert config_data["results-destination-folder"] == str(storage_root / "job-1")
+
     assert config_data["parameters"]["symbol"] == "SPY"
     assert config_data["parameters"]["timeframe"] == "1D"
     assert config_data["parameters"]["foo"] == "bar"
@@ -122,11 +255,33 @@ def test_prepare_job_environment_injects_parameters(monkeypatch: pytest.MonkeyPa
 def test_parse_decimal_handles_various_inputs() -> None:
     parse = app_module._parse_decimal
     assert parse(10) == app_module.Decimal("10")
+    assert parse(0.1) == app_module.Decimal("0.1")
     assert parse("$1,234.50") == app_module.Decimal("1234.50")
     assert parse("12.5%") == app_module.Decimal("12.5")
     assert parse(" ") is None
 
 
+def test_to_float_handles_various_inputs() -> None:
+    to_float = app_module._to_float
+    assert to_float(10) == 10.0
+    assert to_float(1.5) == 1.5
+    assert to_float("$1,234.50") == 1234.5
+    assert to_float("-$5.00") == -5.0
+    assert to_float("12.5%") == 12.5
+    assert to_float(" ") is None
+    assert to_float("n/a") is None
+    assert to_float(None) is None
+
+
+def test_format_iso_date_handles_various_inputs() -> None:
+    format_date = app_module._format_iso_date
+    assert format_date("2021-01-01T00:00:00Z") == "2021-01-01"
+    assert format_date("2021-01-01 09:30:00") == "2021-01-01"
+    assert format_date("2021-01-01") == "2021-01-01"
+    assert format_date("01/02/2021") == "01/02/2021"
+    assert format_date(None) is None
+
+
 def test_extract_price_series_returns_ohlc() -> None:
     report = {
         "charts": {
@@ -189,6 +344,20 @@ def test_extract_orders_normalizes_fields() -> None:
     ]
 
 
+def test_extract_orders_sorts_by_time_then_id() -> None:
+    report = {
+        "orders": {
+            "3": {"id": 3, "symbol": {"value": "SPY"}, "time": "2021-01-02T00:00:00Z"},
+            "2": {"id": 2, "symbol": {"value": "SPY"}, "time": "2021-01-01T00:00:00Z"},
+            "1": {"id": 1, "symbol": {"value": "SPY"}, "time": "2021-01-02T00:00:00Z"},
+            "4": {"id": 4, "symbol": {"value": "SPY"}},
+        }
+    }
+
+    result = app_module._extract_orders(report)
+    assert [order["id"] for order in result] == [4, 2, 1, 3]
+
+
 def test_extract_indicator_series_returns_rsi_values() -> None:
     report = {
         "charts": {
@@ -207,6 +376,18 @@ def test_extract_indicator_series_returns_rsi_values() -> None:
     assert indicator_map["RSI_MA"]["data"][1]["value"] == 52.0
 
 
+def test_extract_indicator_map_deduplicates_ids() -> None:
+    report = {
+        "charts": {
+            "RSI": {"series": {"RSI": {"values": [[1609459200, 50]]}}},
+            "rsi": {"series": {"rsi": {"values": [[1609459200, 51]]}}},
+        }
+    }
+    indicator_map = app_module._extract_indicator_map(report, "SPY")
+    assert list(indicator_map) == ["rsiRsi", "rsiRsi2"]
+    assert indicator_map["rsiRsi2"]["data"][0]["value"] == 51.0
+
+
 def test_extract_trades_formats_summary() -> None:
     summary = {
         "totalPerformance": {
@@ -283,6 +464,40 @@ def test_extract_trades_falls_back_to_report_and_filters_symbol() -> None:
     ]
 
 
+def test_trade_matches_symbol_checks_all_symbol_shapes() -> None:
+    matches = app_module._trade_matches_symbol
+    assert matches({"symbol": "spy"}, "SPY")
+    assert matches({"symbol": {"ticker": "SPY"}}, "SPY")
+    assert matches({"symbol": "SPY R735QTJ8XC9X", "symbolId": "spy"}, "SPY")
+    assert not matches({"symbol": {"value": "QQQ"}}, "SPY")
+    assert matches({}, "SPY")
+
+
+def test_index_job_dir_classifies_lean_artifacts(tmp_path: Path) -> None:
+    for name in (
+        "Algo-summary.json",
+        "Algo.json",
+        "Algo-order-events.json",
+        "Algo.log",
+        "lean-config.json",
+    ):
+        (tmp_path / name).write_text("{}")
+
+    paths = app_module._index_job_dir(tmp_path)
+
+    assert paths == {
+        "summary": tmp_path / "Algo-summary.json",
+        "report": tmp_path / "Algo.json",
+        "order_events": tmp_path / "Algo-order-events.json",
+        "log": tmp_path / "Algo.log",
+    }
+
+
+def test_index_job_dir_omits_missing_report(tmp_path: Path) -> None:
+    (tmp_path / "Algo-summary.json").write_text("{}")
+    assert app_module._index_job_dir(tmp_path) == {"summary": tmp_path / "Algo-summary.json"}
+
+
 def test_run_backtest_job_happy_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     job_id = "job-123"
     payload = app_module.BacktestRequest(
@@ -375,8 +590,9 @@ def test_run_backtest_job_happy_path(monkeypatch: pytest.MonkeyPatch, tmp_path:
         (job_dir / "result.json").write_text(json.dumps(report_payload))
         return {"job_dir": job_dir, "config_path": config_path, "algorithm_manifest": {}}
 
-    def fake_run(*_args: Any, **_kwargs: Any) -> CompletedProcess[str]:
-        return CompletedProcess(args=["dotnet"], returncode=0, stdout="ok", stderr="")
+    def fake_run(*_args: Any, **kwargs: Any) -> CompletedProcess[bytes]:
+        kwargs["stdout"].write(b"ok")
+        return CompletedProcess(args=["dotnet"], returncode=0)
 
     monkeypatch.setattr(app_module, "_prepare_job_environment", fake_prepare)
     monkeypatch.setattr(app_module.subprocess, "run", fake_run)
@@ -391,7 +607,13 @@ def test_run_backtest_job_happy_path(monkeypatch: pytest.MonkeyPatch, tmp_path:
 
     app_module._run_backtest_job(job_id, payload)
 
-    result = app_module.JOB_STORE[job_id]
+    record = app_module.JOB_STORE[job_id]
+    assert record["status"] == "completed"
+    assert "equityCurve" not in record
+    result_path = Path(record["resultPath"])
+    assert result_path.parent == job_dir
+
+    result = json.loads(result_path.read_text())
     assert result["status"] == "completed"
     assert result["netProfit"] == 100.0
     assert result["netProfitPercent"] == 0.01
@@ -401,6 +623,8 @@ def test_run_backtest_job_happy_path(monkeypatch: pytest.MonkeyPatch, tmp_path:
     indicator_map = {item["series"]: item for item in result["indicators"]}
     assert indicator_map["RSI"]["data"][0]["value"] == 50.0
     assert "summaryPath" in result["artifacts"]
+    assert Path(result["artifacts"]["stdoutPath"]).read_bytes() == b"ok"
+    assert "stdout" not in result["artifacts"]
 
 
 def test_run_backtest_job_handles_failure(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
@@ -425,8 +649,9 @@ def test_run_backtest_job_handles_failure(monkeypatch: pytest.MonkeyPatch, tmp_p
         config_path.write_text("{}")
         return {"job_dir": job_dir, "config_path": config_path, "algorithm_manifest": {}}
 
-    def fake_run(*_args: Any, **_kwargs: Any) -> CompletedProcess[str]:
-        return CompletedProcess(args=["dotnet"], returncode=1, stdout="", stderr="boom")
+    def fake_run(*_args: Any, **kwargs: Any) -> CompletedProcess[bytes]:
+        kwargs["stderr"].write(b"boom")
+        return CompletedProcess(args=["dotnet"], returncode=1)
 
     monkeypatch.setattr(app_module, "_prepare_job_environment", fake_prepare)
     monkeypatch.setattr(app_module.subprocess, "run", fake_run)
@@ -444,3 +669,4 @@ def test_run_backtest_job_handles_failure(monkeypatch: pytest.MonkeyPatch, tmp_p
     result = app_module.JOB_STORE[job_id]
     assert result["status"] == "error"
     assert "Lean exited" in result["error"]
+    assert result["error"].endswith("boom")
@@ -5,6 +5,16 @@ from AlgorithmImports import *  # type: ignore
 if TYPE_CHECKING:  # pragma: no cover - hints for tooling
     from AlgorithmImports import MovingAverageType, QCAlgorithm, Resolution, Slice  # type: ignore
 
+# Normalized timeframe -> Lean resolution; anything else runs on daily bars.
+_RESOLUTION_BY_TIMEFRAME = {
+    "1H": Resolution.Hour,  # type: ignore[name-defined]
+    "60": Resolution.Hour,  # type: ignore[name-defined]
+    "HOURLY": Resolution.Hour,  # type: ignore[name-defined]
+    "15M": Resolution.Minute,  # type: ignore[name-defined]
+    "15": Resolution.Minute,  # type: ignore[name-defined]
+    "15MIN": Resolution.Minute,  # type: ignore[name-defined]
+}
+
 
 class BollingerReversion(QCAlgorithm):
     def Initialize(self) -> None:
@@ -22,6 +32,8 @@ class BollingerReversion(QCAlgorithm):
         self.std_dev = float(self.GetParameter("stdDev") or 2.0)
         self.exposure = float(self.GetParameter("exposure") or 0.75)
         self.rsi_period = int(self.GetParameter("rsiPeriod") or 14)
+        # plot=0/false skips chart output for runs whose charts are never viewed.
+        self.plot_enabled = (self.GetParameter("plot") or "1").lower() not in ("0", "false")
 
         self.bbands = self.BB(self.symbol, self.window, self.std_dev, MovingAverageType.Simple, self.resolution)
         self.rsi = self.RSI(self.symbol, self.rsi_period, MovingAverageType.Wilders, self.resolution)
@@ -41,13 +53,15 @@ class BollingerReversion(QCAlgorithm):
         lower = self.bbands.LowerBand.Current.Value
         upper = self.bbands.UpperBand.Current.Value
         middle = self.bbands.MiddleBand.Current.Value
+        rsi = self.rsi.Current.Value
 
-        self.Plot("Bands", "Lower", lower)
-        self.Plot("Bands", "Middle", middle)
-        self.Plot("Bands", "Upper", upper)
-        self.Plot("RSI", "RSI", self.rsi.Current.Value)
+        if self.plot_enabled:
+            self.Plot("Bands", "Lower", lower)
+            self.Plot("Bands", "Middle", middle)
+            self.Plot("Bands", "Upper", upper)
+            self.Plot("RSI", "RSI", rsi)
 
-        if not invested and price < lower and self.rsi.Current.Value < 35:
+        if not invested and price < lower and rsi < 35:
             weight = max(min(self.exposure, 1.0), 0.0)
             self.SetHoldings(self.symbol, weight)
             self.recent_low = price
@@ -55,14 +69,10 @@ class BollingerReversion(QCAlgorithm):
 
         if invested:
             self.recent_low = price if self.recent_low is None else min(self.recent_low, price)
-            if price > middle or self.rsi.Current.Value > 65:
+            if price > middle or rsi > 65:
                 self.Liquidate(self.symbol)
                 self.recent_low = None
 
     def _resolve_resolution(self, value: str) -> Resolution:
         normalized = value.replace(" ", "").upper()
-        if normalized in {"1H", "60", "HOURLY"}:
-            return Resolution.Hour  # type: ignore[name-defined]
-        if normalized in {"15M", "15", "15MIN"}:
-            return Resolution.Minute  # type: ignore[name-defined]
-        return Resolution.Daily  # type: ignore[name-defined]
+        return _RESOLUTION_BY_TIMEFRAME.get(normalized, Resolution.Daily)  # type: ignore[name-defined]
@@ -15,6 +15,8 @@ class RsiMaCrossAlgorithm(QCAlgorithm):
         self.rsi_period = int(self.GetParameter("rsiPeriod") or 14)
         self.rsi_ma_period = int(self.GetParameter("smoothingPeriod") or 10)
         self.exposure = float(self.GetParameter("exposure") or 1.0)
+        # plot=0/false skips chart output for runs whose charts are never viewed.
+        self.plot_enabled = (self.GetParameter("plot") or "1").lower() not in ("0", "false")
         self.rsi = self.RSI(self.symbol, self.rsi_period, MovingAverageType.Wilders, Resolution.Daily)  # type: ignore[name-defined]
         self.rsi_ma = SimpleMovingAverage(self.rsi_ma_period)
 
@@ -26,11 +28,13 @@ class RsiMaCrossAlgorithm(QCAlgorithm):
         if not self.rsi.IsReady:
             return
 
-        self.rsi_ma.Update(self.Time, self.rsi.Current.Value)
+        rsi = self.rsi.Current.Value
+        self.rsi_ma.Update(self.Time, rsi)
         if self.IsWarmingUp or not self.rsi_ma.IsReady:
             return
 
-        spread = self.rsi.Current.Value - self.rsi_ma.Current.Value
+        rsi_ma = self.rsi_ma.Current.Value
+        spread = rsi - rsi_ma
         if self.prev_spread is None:
             self.prev_spread = spread
             return
@@ -43,5 +47,6 @@ class RsiMaCrossAlgorithm(QCAlgorithm):
 
         self.prev_spread = spread
 
-        self.Plot("RSI", "RSI", self.rsi.Current.Value)
-        self.Plot("RSI", "RSI_MA", self.rsi_ma.Current.Value)
+        if self.plot_enabled:
+            self.Plot("RSI", "RSI", rsi)
+            self.Plot("RSI", "RSI_MA", rsi_ma)
@@ -2,9 +2,15 @@ import csv
 import datetime as dt
 import io
 import json
+import os
 import zipfile
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional outside the backend venv
+    orjson = None
+
 ROOT = Path(__file__).resolve().parent.parent
 DATA_ZIP_PATH = ROOT.parent / 'Lean/Data/equity/usa/daily/spy.zip'
 OUTPUT_PATH = ROOT / 'results/spy_daily_2016_2020.json'
@@ -17,12 +23,19 @@ def filter_rows():
         with zf.open('spy.csv') as raw_file:
             reader = csv.reader(io.TextIOWrapper(raw_file))
             next(reader)  # skip header
+            start_prefix = START_DATE.strftime('%Y%m%d')
+            end_prefix = END_DATE.strftime('%Y%m%d')
             for row in reader:
-                date = dt.datetime.strptime(row[0], '%Y%m%d %H:%M')
-                if date < START_DATE or date > END_DATE:
+                # Timestamps are fixed-width "YYYYMMDD HH:MM" and rows are chronological, so an
+                # 8-character prefix compare is enough to skip early rows and stop past the end.
+                stamp = row[0]
+                prefix = stamp[:8]
+                if prefix < start_prefix:
                     continue
+                if prefix > end_prefix:
+                    break
                 yield {
-                    'time': date.strftime('%Y-%m-%d'),
+                    'time': f'{stamp[:4]}-{stamp[4:6]}-{stamp[6:8]}',
                     'open': float(row[1]),
                     'high': float(row[2]),
                     'low': float(row[3]),
@@ -31,9 +44,28 @@ def filter_rows():
                 }
 
 
+def encode_record(record):
+    if orjson is not None:
+        return orjson.dumps(record)
+    return json.dumps(record, separators=(',', ':')).encode('utf-8')
+
+
 def main():
-    records = list(filter_rows())
-    OUTPUT_PATH.write_text(json.dumps(records))
+    # Stream the JSON array record by record so the export never holds every row in memory.
+    # Rows go to a sibling temp file that only replaces the served sample once complete.
+    tmp_path = OUTPUT_PATH.with_suffix('.json.tmp')
+    try:
+        with tmp_path.open('wb') as output:
+            output.write(b'[')
+            for index, record in enumerate(filter_rows()):
+                if index:
+                    output.write(b',')
+                output.write(encode_record(record))
+            output.write(b']')
+        os.replace(tmp_path, OUTPUT_PATH)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 
 if __name__ == '__main__':
@@ -5,6 +5,16 @@ from AlgorithmImports import *  # type: ignore
 if TYPE_CHECKING:  # pragma: no cover - hints for tooling
     from AlgorithmImports import MovingAverageType, QCAlgorithm, Resolution, Slice  # type: ignore
 
+# Normalized timeframe -> Lean resolution; anything else runs on daily bars.
+_RESOLUTION_BY_TIMEFRAME = {
+    "1H": Resolution.Hour,  # type: ignore[name-defined]
+    "60": Resolution.Hour,  # type: ignore[name-defined]
+    "HOURLY": Resolution.Hour,  # type: ignore[name-defined]
+    "15M": Resolution.Minute,  # type: ignore[name-defined]
+    "15": Resolution.Minute,  # type: ignore[name-defined]
+    "15MIN": Resolution.Minute,  # type: ignore[name-defined]
+}
+
 
 class EmaTrendFollower(QCAlgorithm):
     def Initialize(self) -> None:
@@ -24,6 +34,8 @@ class EmaTrendFollower(QCAlgorithm):
         self.atr_multiplier = float(self.GetParameter("atrMultiplier") or 2.5)
         self.exposure = float(self.GetParameter("exposure") or 1.0)
         self.rsi_period = int(self.GetParameter("rsiPeriod") or 14)
+        # plot=0/false skips chart output for runs whose charts are never viewed.
+        self.plot_enabled = (self.GetParameter("plot") or "1").lower() not in ("0", "false")
 
         self.fast_ema = self.EMA(self.symbol, self.fast_period, self.resolution)
         self.slow_ema = self.EMA(self.symbol, self.slow_period, self.resolution)
@@ -43,31 +55,34 @@ class EmaTrendFollower(QCAlgorithm):
         price = self.Securities[self.symbol].Price
         invested = self.Portfolio[self.symbol].Invested
 
-        self.Plot("Trend", "FastEMA", self.fast_ema.Current.Value)
-        self.Plot("Trend", "SlowEMA", self.slow_ema.Current.Value)
-        self.Plot("RSI", "RSI", self.rsi.Current.Value)
+        # Each indicator read crosses into .NET, so read every value once per bar.
+        fast = self.fast_ema.Current.Value
+        slow = self.slow_ema.Current.Value
+        rsi = self.rsi.Current.Value
+        atr = self.atr.Current.Value
+
+        if self.plot_enabled:
+            self.Plot("Trend", "FastEMA", fast)
+            self.Plot("Trend", "SlowEMA", slow)
+            self.Plot("RSI", "RSI", rsi)
 
-        if not invested and self.fast_ema.Current.Value > self.slow_ema.Current.Value and self.rsi.Current.Value > 50:
+        if not invested and fast > slow and rsi > 50:
             weight = max(min(self.exposure, 1.0), 0.0)
             self.SetHoldings(self.symbol, weight)
-            self.trailing_stop = price - self.atr_multiplier * self.atr.Current.Value
+            self.trailing_stop = price - self.atr_multiplier * atr
             return
 
         if invested:
+            candidate = price - self.atr_multiplier * atr
             if self.trailing_stop is None:
-                self.trailing_stop = price - self.atr_multiplier * self.atr.Current.Value
+                self.trailing_stop = candidate
             else:
-                candidate = price - self.atr_multiplier * self.atr.Current.Value
                 self.trailing_stop = max(self.trailing_stop, candidate)
 
-            if self.fast_ema.Current.Value < self.slow_ema.Current.Value or price < (self.trailing_stop or price):
+            if fast < slow or price < (self.trailing_stop or price):
                 self.Liquidate(self.symbol)
                 self.trailing_stop = None
 
     def _resolve_resolution(self, value: str) -> Resolution:
         normalized = value.replace(" ", "").upper()
-        if normalized in {"1H", "60", "HOURLY"}:
-            return Resolution.Hour  # type: ignore[name-defined]
-        if normalized in {"15M", "15", "15MIN"}:
-            return Resolution.Minute  # type: ignore[name-defined]
-        return Resolution.Daily  # type: ignore[name-defined]
+        return _RESOLUTION_BY_TIMEFRAME.get(normalized, Resolution.Daily)  # type: ignore[name-defined]